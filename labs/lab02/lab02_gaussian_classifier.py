@@ -11,12 +11,12 @@ using Python libraries.
 from __future__ import annotations
 
 import math
-from dataclasses import dataclass
-from typing import Dict, Iterable, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
 
 import matplotlib.pyplot as plt
 import numpy as np
-from sklearn.metrics import confusion_matrix, roc_curve, auc
+from sklearn.metrics import confusion_matrix, auc
 
 
 # -----------------------------------------------------------------------------
@@ -25,12 +25,25 @@ from sklearn.metrics import confusion_matrix, roc_curve, auc
 
 @dataclass
 class GaussianClassifier:
-    """Container for Gaussian classifier parameters."""
+    """Container for Gaussian classifier parameters.
+
+    ``log_norm`` and ``half_inv_sigma2`` are derived from the variances on
+    construction so density evaluations do not recompute them.
+    """
 
     gtype: str
     priors: np.ndarray  # shape (K,)
     means: np.ndarray  # shape (K, D)
     variances: np.ndarray  # shape (K,) for 'I', shape (1,) for 'i'
+    log_norm: np.ndarray = field(init=False)  # shape (K,), log Gaussian normalizer
+    half_inv_sigma2: np.ndarray = field(init=False)  # shape (K,), 1 / (2 sigma^2)
+
+    def __post_init__(self) -> None:
+        K, D = self.means.shape
+        variances = np.asarray(self.variances, dtype=float)
+        sigma2 = np.full(K, variances[0]) if self.gtype == "i" else variances
+        self.log_norm = -0.5 * D * np.log(2.0 * math.pi * sigma2)
+        self.half_inv_sigma2 = 0.5 / sigma2
 
 
 # -----------------------------------------------------------------------------
@@ -55,88 +68,204 @@ def gm_sample(
     n_components = priors.size
     components = rng.choice(n_components, size=n_samples, p=priors)
 
-    X = np.empty((n_samples, means.shape[1]), dtype=float)
-    for k in range(n_components):
-        idx = components == k
-        if not np.any(idx):
-            continue
-        sigma = math.sqrt(float(variances[k]))
-        X[idx] = rng.normal(loc=means[k], scale=sigma, size=(idx.sum(), means.shape[1]))
+    # Draw all points at unit scale, then shift/scale each by its component.
+    z = rng.standard_normal((n_samples, means.shape[1]))
+    X = means[components] + np.sqrt(variances[components])[:, None] * z
 
     return X, components
 
 
-def fit_gaussian_classifier(X: np.ndarray, y: np.ndarray, gtype: str) -> GaussianClassifier:
-    """Estimate Gaussian classifier parameters under a given covariance type."""
+def _class_indices(
+    y: np.ndarray, classes: np.ndarray | None = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the sorted class labels and the dense class index of each y.
+
+    Passing precomputed ``classes`` (from ``np.unique(y)``) avoids re-sorting y;
+    it must be sorted in strictly increasing order, as ``np.unique`` returns it.
+    """
+
+    if classes is None:
+        # searchsorted into the few unique labels is cheaper than return_inverse.
+        classes = np.unique(y)
+        return classes, np.searchsorted(classes, y)
+
+    classes = np.asarray(classes)
+    if np.any(classes[1:] <= classes[:-1]):
+        raise ValueError("classes must be sorted and unique, as from np.unique(y).")
+    y_idx = np.clip(np.searchsorted(classes, y), 0, classes.size - 1)
+    if not np.array_equal(classes[y_idx], y):
+        raise ValueError("Labels in y are missing from the given classes.")
+    return classes, y_idx
+
+
+def fit_gaussian_classifier(
+    X: np.ndarray, y: np.ndarray, gtype: str, classes: np.ndarray | None = None
+) -> GaussianClassifier:
+    """Estimate Gaussian classifier parameters under a given covariance type.
+
+    ``classes`` may hold the precomputed (sorted) ``np.unique(y)`` to skip
+    that sort.
+    """
 
     if gtype not in {"I", "i"}:
         raise ValueError(f"Unsupported covariance type '{gtype}'. Use 'I' or 'i'.")
 
     X = np.asarray(X, dtype=float)
     y = np.asarray(y, dtype=int)
-    classes = np.unique(y)
+    classes, y_idx = _class_indices(y, classes)
     K = classes.size
-    D = X.shape[1]
-
-    priors = np.zeros(K, dtype=float)
-    means = np.zeros((K, D), dtype=float)
-    variances = np.zeros(K if gtype == "I" else 1, dtype=float)
+    N, D = X.shape
+
+    # Per-class counts and sums, accumulated without looping over classes.
+    counts = np.bincount(y_idx, minlength=K)
+    if np.any(counts == 0):
+        raise ValueError(f"Classes {classes[counts == 0]} have no samples in y.")
+    sums = np.stack(
+        [np.bincount(y_idx, weights=X[:, d], minlength=K) for d in range(D)], axis=1
+    )
 
-    for idx, k in enumerate(classes):
-        Xk = X[y == k]
-        priors[idx] = Xk.shape[0] / X.shape[0]
-        means[idx] = Xk.mean(axis=0)
-        sq_norm = np.sum((Xk - means[idx]) ** 2, axis=1)
-        variances[idx if gtype == "I" else 0] += sq_norm.sum() / (Xk.shape[0] * D)
+    priors = counts / N
+    means = sums / counts[:, None]
+    # Centre before squaring: E||x||^2 - ||mu||^2 cancels badly for offset data.
+    # One column at a time, so no centred (N, D) copy of X is built.
+    sq_norms = np.zeros(N)
+    for d in range(D):
+        xc = X[:, d] - means[:, d].take(y_idx)
+        sq_norms += xc * xc
+    sq_sums = np.bincount(y_idx, weights=sq_norms, minlength=K)
+    class_variances = sq_sums / (counts * D)
 
     if gtype == "I":
-        variances = np.clip(variances, 1e-9, None)
+        variances = np.clip(class_variances, 1e-9, None)
     else:
-        variances[:] = np.clip(variances[0] / K, 1e-9, None)
+        variances = np.clip(np.array([class_variances.mean()]), 1e-9, None)
 
     return GaussianClassifier(gtype=gtype, priors=priors, means=means, variances=variances)
 
 
+def _squared_distances(X: np.ndarray, means: np.ndarray) -> np.ndarray:
+    """Squared Euclidean distances ||x - m||^2 of shape (N, K) via one GEMM.
+
+    The result is the transpose of a class-major (K, N) array, so elementwise
+    work runs over the long N axis rather than K at a time.
+    """
+
+    X2 = np.einsum("nd,nd->n", X, X)
+    M2 = np.einsum("kd,kd->k", means, means)
+    cross = means @ X.T
+    # Cancellation can leave tiny negative values for points on a mean.
+    return np.maximum(M2[:, None] + X2[None, :] - 2.0 * cross, 0.0).T
+
+
+def _log_normalize(log_joint: np.ndarray) -> np.ndarray:
+    """Turn log p(x, C) into log p(C|x) with a max-shifted log-sum-exp."""
+
+    m = log_joint.max(axis=1, keepdims=True)
+    shifted = log_joint - m
+    return shifted - np.log(np.exp(shifted).sum(axis=1, keepdims=True))
+
+
+def _working_dtype(X: np.ndarray) -> np.dtype:
+    """Floating-point dtype to compute in: X's own, or float64 for integers.
+
+    Half precision is promoted to float32.
+    """
+
+    if np.issubdtype(X.dtype, np.floating):
+        return np.result_type(X.dtype, np.float32)
+    return np.dtype(np.float64)
+
+
+def gaussian_log_pdf(X: np.ndarray, model: GaussianClassifier) -> np.ndarray:
+    """Compute log p(x|C) for all classes in the floating-point dtype of X."""
+
+    X = np.asarray(X)
+    dtype = _working_dtype(X)
+    X = X.astype(dtype, copy=False)
+    D = X.shape[1]
+    means = model.means.astype(dtype, copy=False)
+    half_inv_sigma2 = model.half_inv_sigma2.astype(dtype, copy=False)
+    log_norm = model.log_norm.astype(dtype, copy=False)
+
+    if D == 1:
+        # Closed-form 1D path: no GEMM, no axis reduction, no D-dependent pow.
+        # Evaluated class-major as (K, N) and returned as an (N, K) view.
+        diff = X[:, 0][None, :] - means[:, :1]
+        return (log_norm[:, None] - diff * diff * half_inv_sigma2[:, None]).T
+
+    sq = _squared_distances(X, means)
+    return log_norm[None, :] - sq * half_inv_sigma2[None, :]
+
+
+def _log_joint(X: np.ndarray, model: GaussianClassifier) -> np.ndarray:
+    """Compute log p(x|C) + log p(C) for all classes."""
+
+    log_px_given_c = gaussian_log_pdf(X, model)
+    log_priors = np.log(model.priors).astype(log_px_given_c.dtype, copy=False)
+    return log_px_given_c + log_priors[None, :]
+
+
 def gaussian_pdf(
     X: np.ndarray, model: GaussianClassifier
-) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
-    """Compute p(x), p(x|C), p(C|x), and p(x, C) for all classes."""
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Compute p(x|C) and log p(C|x) for all classes.
 
-    X = np.asarray(X, dtype=float)
-    K = model.priors.size
-    D = X.shape[1]
+    The joint p(x, C) = p(x|C) p(C) is left to callers that need it.
+
+    Results are computed in the floating-point dtype of ``X`` (float64 for
+    integer input), so a float32 grid is evaluated without being copied.
+    """
+
+    log_px_given_c = gaussian_log_pdf(X, model)
+    px_given_c = np.exp(log_px_given_c)
+    log_priors = np.log(model.priors).astype(log_px_given_c.dtype, copy=False)
+
+    # Normalize in log-space so posteriors stay well defined in the tails.
+    log_posteriors = _log_normalize(log_px_given_c + log_priors[None, :])
+
+    return px_given_c, log_posteriors
 
-    px_given_c = np.zeros((X.shape[0], K), dtype=float)
-    for k in range(K):
-        mean = model.means[k]
-        if model.gtype == "i":
-            sigma2 = float(model.variances[0])
-        else:
-            sigma2 = float(model.variances[k])
 
-        coef = 1.0 / ((2.0 * math.pi * sigma2) ** (D / 2))
-        diff = X - mean
-        exponent = -0.5 * np.sum(diff * diff, axis=1) / sigma2
-        px_given_c[:, k] = coef * np.exp(exponent)
+def fit_and_score(
+    X: np.ndarray, y: np.ndarray, gtype: str, classes: np.ndarray | None = None
+) -> Tuple[GaussianClassifier, np.ndarray]:
+    """Fit a Gaussian classifier and return it with its training posteriors.
 
-    px = px_given_c @ model.priors
-    px = np.clip(px, 1e-12, None)
-    px_and_c = px_given_c * model.priors
-    p_c_given_x = px_and_c / px[:, None]
+    The posteriors are scored exactly as :func:`evaluate_classifier` would
+    score X, so they can be passed straight to it.
+    """
 
-    return px, px_given_c, p_c_given_x, px_and_c
+    X = np.asarray(X, dtype=float)
+    model = fit_gaussian_classifier(X, y, gtype, classes)
+    posteriors = np.exp(_log_normalize(_log_joint(X, model)))
+    return model, posteriors
 
 
 def evaluate_classifier(
-    X: np.ndarray, y: np.ndarray, model: GaussianClassifier
+    X: np.ndarray,
+    y: np.ndarray,
+    model: GaussianClassifier,
+    posteriors: np.ndarray | None = None,
+    roc: bool = True,
+    classes: np.ndarray | None = None,
 ) -> Dict[str, np.ndarray | float]:
-    """Predict labels, compute error statistics and confusion matrix."""
-
-    _, _, posteriors, _ = gaussian_pdf(X, model)
-    y_pred = posteriors.argmax(axis=1)
+    """Predict labels, compute error statistics and confusion matrix.
+
+    Pass ``posteriors`` (e.g. from :func:`fit_and_score`) to skip rescoring X.
+    Set ``roc=False`` to skip the ROC curve (see :func:`evaluate_many`).
+    ``classes`` may hold the precomputed ``np.unique(y)``.
+    """
+
+    if posteriors is None:
+        # Decide in log-space: argmax of log p(x|C) + log p(C) needs no exp().
+        log_joint = _log_joint(X, model)
+        y_pred = log_joint.argmax(axis=1)
+        posteriors = np.exp(_log_normalize(log_joint))
+    else:
+        y_pred = posteriors.argmax(axis=1)
     error = float(np.mean(y_pred != y))
 
-    labels = np.unique(y)
+    labels = np.unique(y) if classes is None else classes
     cn_counts = confusion_matrix(y, y_pred, labels=labels)
     with np.errstate(divide="ignore", invalid="ignore"):
         cn_norm = cn_counts / cn_counts.sum(axis=1, keepdims=True)
@@ -150,25 +279,92 @@ def evaluate_classifier(
         "posteriors": posteriors,
     }
 
-    if labels.size == 2:
-        fpr, tpr, _ = roc_curve(y, posteriors[:, 1])
+    if roc and labels.size == 2:
+        fpr, tpr = _roc_curves(y == labels[1], posteriors[:, 1:])[0]
         metrics.update({"fpr": fpr, "tpr": tpr, "auc": auc(fpr, tpr)})
 
     return metrics
 
 
+def _roc_curves(
+    y_true: np.ndarray, scores: np.ndarray
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """ROC curves (fpr, tpr) for each column of an (N, M) score matrix.
+
+    All columns are sorted in one call and TP/FP counts come from cumulative
+    sums; only points where a column's score changes are kept, so tied
+    scores form a single threshold as in ``sklearn.metrics.roc_curve``.
+    """
+
+    y_true = np.asarray(y_true, dtype=bool)
+    n_pos = np.count_nonzero(y_true)
+    n_neg = y_true.size - n_pos
+
+    order = np.argsort(-scores, axis=0, kind="stable")
+    sorted_scores = np.take_along_axis(scores, order, axis=0)
+    tps = np.cumsum(y_true[order], axis=0)
+    fps = np.arange(1, y_true.size + 1)[:, None] - tps
+
+    curves = []
+    for m in range(scores.shape[1]):
+        thresholds = np.r_[np.flatnonzero(np.diff(sorted_scores[:, m])), y_true.size - 1]
+        fpr = np.r_[0.0, fps[thresholds, m] / n_neg]
+        tpr = np.r_[0.0, tps[thresholds, m] / n_pos]
+        curves.append((fpr, tpr))
+    return curves
+
+
+def evaluate_many(
+    X: np.ndarray,
+    y: np.ndarray,
+    models: Dict[str, GaussianClassifier],
+    posteriors: Dict[str, np.ndarray] | None = None,
+    classes: np.ndarray | None = None,
+) -> Dict[str, Dict[str, np.ndarray | float]]:
+    """Evaluate several classifiers on the same data.
+
+    For binary problems the ROC curves of all models are computed together
+    from their stacked p(C=1|x) scores.
+    """
+
+    labels = np.unique(y) if classes is None else classes
+    posteriors = posteriors or {}
+    evaluations = {
+        label: evaluate_classifier(
+            X, y, model, posteriors=posteriors.get(label), roc=False, classes=labels
+        )
+        for label, model in models.items()
+    }
+
+    if labels.size == 2 and evaluations:
+        scores = np.column_stack([ev["posteriors"][:, 1] for ev in evaluations.values()])
+        curves = _roc_curves(y == labels[1], scores)
+        for ev, (fpr, tpr) in zip(evaluations.values(), curves):
+            ev.update({"fpr": fpr, "tpr": tpr, "auc": auc(fpr, tpr)})
+
+    return evaluations
+
+
 def plot_classifier_results(
     X: np.ndarray,
     y: np.ndarray,
     model: GaussianClassifier,
     evaluation: Dict[str, np.ndarray | float],
     x_grid: np.ndarray,
+    grid_densities: Tuple[np.ndarray, np.ndarray],
     idx: int,
 ) -> None:
-    """Plot density and posterior curves for a Gaussian classifier."""
+    """Plot density and posterior curves for a Gaussian classifier.
 
-    _, px_given_c_grid, posteriors_grid, px_and_c_grid = gaussian_pdf(x_grid, model)
+    ``grid_densities`` holds p(x|C) and log p(C|x) evaluated on ``x_grid``,
+    as returned by :func:`gaussian_pdf`.
+    """
+
+    px_given_c_grid, log_posteriors_grid = grid_densities
+    posteriors_grid = np.exp(log_posteriors_grid)
+    px_and_c_grid = px_given_c_grid * model.priors.astype(px_given_c_grid.dtype)
     colors = plt.cm.get_cmap("tab10", model.priors.size)
+    rgba_y = colors(np.asarray(y, dtype=np.intp))
 
     fig = plt.figure(idx, figsize=(10, 8))
     fig.clf()
@@ -193,7 +389,7 @@ def plot_classifier_results(
     ax1.scatter(
         X[:, 0],
         np.zeros_like(X[:, 0]) - 0.05 * px_given_c_grid.max(),
-        c=[colors(int(cls)) for cls in y],
+        c=rgba_y,
         marker="x",
         s=70,
         label="samples",
@@ -219,7 +415,7 @@ def plot_classifier_results(
     ax2.scatter(
         x_grid[:, 0],
         np.ones_like(x_grid[:, 0]) * 1.05,
-        c=[colors(int(cls)) for cls in predicted_grid],
+        c=colors(predicted_grid),
         s=50,
         marker=".",
         alpha=0.6,
@@ -228,7 +424,7 @@ def plot_classifier_results(
     ax2.scatter(
         X[:, 0],
         np.zeros_like(X[:, 0]) - 0.05,
-        c=[colors(int(cls)) for cls in y],
+        c=rgba_y,
         marker="x",
         s=70,
     )
@@ -285,18 +481,28 @@ def main() -> None:
     # Grid for plotting densities
     x_min = float(np.min(means - 4 * np.sqrt(variances[:, None])))
     x_max = float(np.max(means + 4 * np.sqrt(variances[:, None])))
-    x_grid = np.linspace(x_min, x_max, 1000, dtype=float)[:, None]
+    x_grid = np.linspace(x_min, x_max, 1000, dtype=np.float32)[:, None]
+
+    # Both models are fit on the same labels, so sort them only once.
+    classes = np.unique(y)
+    gtypes = ["I", "i"]
+    models = {}
+    train_posteriors = {}
+    for gtype in gtypes:
+        models[gtype], train_posteriors[gtype] = fit_and_score(X, y, gtype, classes)
+    evaluations = evaluate_many(X, y, models, posteriors=train_posteriors, classes=classes)
 
     classifiers = {}
     roc_info: Dict[str, Dict[str, np.ndarray | float]] = {}
 
-    for idx, gtype in enumerate(["I", "i"], start=1):
-        model = fit_gaussian_classifier(X, y, gtype)
-        evaluation = evaluate_classifier(X, y, model)
+    for idx, gtype in enumerate(gtypes, start=1):
+        model = models[gtype]
+        evaluation = evaluations[gtype]
         classifiers[gtype] = (model, evaluation)
 
         # Plot densities and posteriors
-        plot_classifier_results(X, y, model, evaluation, x_grid, idx)
+        grid = gaussian_pdf(x_grid, model)
+        plot_classifier_results(X, y, model, evaluation, x_grid, grid, idx)
 
         if y.max() == 1:
             fpr = evaluation.get("fpr")